@@ -1,23 +1,88 @@
 #!/usr/bin/env python
 # CSP-problem class by Ilse van der Linden & Sander van Dorsten
 
-""" Module that is able to solve CSPs. The problems are modelled as a constraints, which this module tries to satisfy. The solver implemented uses a recursive backtracker to search the searchspace (depth-first search) and returns a single solution found.
+""" Module that is able to solve CSPs. The problems are modelled as a constraints, which this module tries to satisfy. The solver implemented uses a backtracker with an explicit stack (instead of recursion) to search the searchspace (depth-first search) and returns a single solution found.
 
 """
 
 import time
 from collections import namedtuple
-from copy import deepcopy
 from pprint import pprint
 
 # namedtuple for statistics. lighter datastructure than an class, but has a lot of accessibility options. easily configurable if you want to return more sorts of statistics.
 Statistics = namedtuple("Statistics", "runtime, splits")
 
+# domains are stored as bitmasks: bit i is set if value i is in the domain. int.bit_count only exists from python 3.10 onwards.
+try:
+    _popcount = int.bit_count
+except AttributeError:
+    def _popcount(mask):
+        return bin(mask).count("1")
+
+# the runtime is measured in cpu time of the process, so it does not grow when other processes (like parallel solvers) run on the same cpu.
+# time.process_time only exists from python 3.3 onwards, time.clock gives the cpu time on unix in python 2.
+try:
+    _cpu_time = time.process_time
+except AttributeError:
+    _cpu_time = time.clock
+
+def domain2mask(domain):
+    """ rewrites a domain of the form [1, 2, 5] to the bitmask 0b100110.
+    """
+    mask = 0
+    for value in domain:
+        mask |= 1 << value
+    return mask
+
+def _iter_bits(mask):
+    """ yields a (bit, value) pair for every value in the bitmask, from low to high. 0b100110 yields (0b10, 1), (0b100, 2) and (0b100000, 5).
+    """
+    while mask:
+        # the lowest set bit
+        bit = mask & -mask
+        yield bit, bit.bit_length() - 1
+        mask ^= bit
+
+def mask2domain(mask):
+    """ rewrites a bitmask of the form 0b100110 back to the domain [1, 2, 5].
+    """
+    return [value for bit, value in _iter_bits(mask)]
+
+def propagate(variables, neighbors, assigned, trail):
+    """ the inner loop of the solver: removes the value of every assigned variable from the domains of its neighbors. Variables that get assigned by this are appended to assigned, and are propagated as well.
+        this only works on the domain bitmasks and the neighbor sets that are passed in, and not on the problem itself, to keep the loop free of attribute lookups.
+
+        @param variables: the domain bitmask of every variable
+        @param neighbors: the variables that every variable shares a constraint with
+        @param assigned:  the assigned variables to propagate
+        @param trail:     list to which every removal is appended as a (variable, value bit) tuple
+        @rtype: False if a domain becomes empty, True otherwise.
+    """
+    # Loop over assigned variables
+    for var1 in assigned:
+        bit = variables[var1]
+        # Loop over the variables that assigned var is constrained by
+        for var2 in neighbors[var1]:
+            # If variables that assigned var is constrained by
+            # have its assigned value in domain, remove it
+            mask = variables[var2]
+            if mask & bit:
+                mask ^= bit
+                variables[var2] = mask
+                trail.append((var2, bit))
+                if mask == 0:
+                    return False
+                # a variable is only added when its domain shrinks to a single value, which happens at most once:
+                # removing a value from it after that empties the domain and stops the update. So no variable is propagated twice.
+                if mask & (mask - 1) == 0:
+                    assigned.append(var2)
+    return True
+
 class Problem(object):
     """ An instance of a CSP problem
 
     """
-    def __init__(self, minimal_remaining_values = False, forward_checking = False, degree_heuristic = False ):
+    def __init__(self, minimal_remaining_values = False, forward_checking = False, degree_heuristic = False, least_constraining_value = False ):
         """ set some init values for the instantiated CSP.
         """
 
@@ -25,12 +90,23 @@ class Problem(object):
         self.fc = forward_checking
         self.mrv = minimal_remaining_values
         self.dh = degree_heuristic
+        self.lcv = least_constraining_value
 
         # init assignments
-        self.solver = BacktrackingSolver(forward_checking=self.fc, minimal_remaining_values=self.mrv, degree_heuristic = self.dh)
+        self.solver = BacktrackingSolver(forward_checking=self.fc, minimal_remaining_values=self.mrv, degree_heuristic = self.dh, least_constraining_value = self.lcv)
         self.constraints = []
         self.variables = {}
         self.var_constr_dict = {}
+        self.var_neighbors = {}
+        # shared constraints and their var_neighbors, see addSharedConstraints
+        self.shared_constraints = []
+        self.shared_neighbors = None
+
+        # the solver works on variable ids instead of the variables themselves: masks[i] is the domain bitmask of var_list[i]
+        self.var_list = []
+        self.var_id = {}
+        self.masks = []
+        self.neighbor_ids = []
         
         #statistical values
         self.runtime = 0
@@ -46,6 +122,21 @@ class Problem(object):
             constrained_variables = self.variables
         constraint = AllDifferentConstraint(constrained_variables)
         self.constraints.append(constraint)
+        self._clearIndex()
+
+    def addSharedConstraints(self, constraints, var_neighbors):
+        """ Add constraint objects that are made once and shared between problems over the same variables, together with the neighbors of the variables under these constraints. Use this instead of addConstraint, when solving many problems with the same constraints (like sudokus).
+        the constraint objects and neighbor sets are then not rebuilt for every problem. Constraints added with addConstraint are still added to the neighbors.
+
+        @param constraints:   constraint objects over the variables of the problem
+        @type constraints:    a list of AllDifferentConstraint
+        @param var_neighbors: maps every variable to the variables it shares a constraint with
+        @type var_neighbors:  a dictionary of frozensets
+        """
+        self.constraints.extend(constraints)
+        self.shared_constraints.extend(constraints)
+        self.shared_neighbors = var_neighbors
+        self._clearIndex()
 
     def addVariable(self, variable, domain):
         """ Add a single variable to the Problem with a given domain
@@ -53,9 +144,29 @@ class Problem(object):
         @param variable: variable that we add to our problem variables
         @type variable:  some single value, for example a string, an int. In the sudoku case, it's a tuple.
         @param domain:   Domain of the added variable
-        @type domain:    instance of Domain, a list
+        @type domain:    instance of Domain, a list of non-negative ints. It is stored as a bitmask.
+        """
+        self.addVariableMask(variable, domain2mask(domain))
+
+    def addVariableMask(self, variable, mask):
+        """ Add a single variable to the Problem with a domain that is already a bitmask, or replace the domain of a variable (for example in a clone).
+
+        @param variable: variable that we add to our problem variables
+        @param mask:     Domain of the added variable as a bitmask, bit i is set if value i is in the domain.
+        @type mask:      int
+        """
+        # only a new variable changes the ids and neighbors, a new domain for a known variable is picked up by getSolution anyway
+        if variable not in self.var_id:
+            self._clearIndex()
+        self.variables[variable] = mask
+
+    def _clearIndex(self):
+        """ forgets the variable ids and neighbors after a variable or constraint is added, so getSolution maps and indexes the problem again.
         """
-        self.variables[variable] = domain
+        self.var_list = []
+        self.var_id = {}
+        self.var_neighbors = {}
+        self.neighbor_ids = []
 
     def addVariables(self, variables, domain):
         """ Add multiple variables to the problem with the same given domain
@@ -71,8 +182,12 @@ class Problem(object):
     def mapVarToConstraints(self):
         """ Based on variables and constraint list, make dictionary that
         maps variables to their constraints.
+        Also makes the dictionary var_neighbors, that maps variables to the set of all variables they share a constraint with.
         """
 
+        # new dictionaries are made, as a clone shares the old ones with its template
+        self.var_constr_dict = {}
+        self.var_neighbors = {}
         for variable in self.variables:
             self.var_constr_dict[variable] = []
 
@@ -80,20 +195,82 @@ class Problem(object):
             for key in constraint_obj.const_vars:
                 # add the constraint object itself to the list of constraints for that variable
                 self.var_constr_dict[key].append(constraint_obj)
+
+        # the neighbors under shared constraints are given, so only the neighbors under the other constraints are collected
+        shared_constraints = set(self.shared_constraints)
+        if self.shared_neighbors is not None and len(shared_constraints) == len(self.constraints):
+            self.var_neighbors = self.shared_neighbors
+            return self.var_constr_dict
+
+        neighbors = {}
+        for variable, constraints in self.var_constr_dict.items():
+            if self.shared_neighbors is not None:
+                neighbors[variable] = set(self.shared_neighbors.get(variable, ()))
+            else:
+                neighbors[variable] = set()
+            for constraint_obj in constraints:
+                if constraint_obj not in shared_constraints:
+                    neighbors[variable].update(constraint_obj.getOthers(variable))
+
+        # a variable can share more than one constraint with a neighbor (in sudoku: a row and a box), but it is only stored once.
+        for variable, neighbor_set in neighbors.items():
+            self.var_neighbors[variable] = frozenset(neighbor_set)
         return self.var_constr_dict
 
+    def indexVariables(self):
+        """ gives every variable an id, and stores the neighbors by id in flat lists. The domains are stored by id in getSolution.
+        the solver only works on these lists, so self.variables is left as it is.
+        """
+        # ids follow the sorted order of the variables, so the heuristics break ties between variables in the same way on every python version.
+        try:
+            self.var_list = sorted(self.variables)
+        except TypeError:
+            # variables that cannot be compared keep the order of the dictionary
+            self.var_list = list(self.variables)
+        self.var_id = dict((variable, i) for i, variable in enumerate(self.var_list))
+        self.neighbor_ids = [frozenset(self.var_id[neighbor] for neighbor in self.var_neighbors[variable]) for variable in self.var_list]
+
+    def clone(self):
+        """ makes a copy of this problem with its own domains and constraint list, that shares the constraint objects, the neighbors and the variable ids with this problem.
+        when solving many problems over the same variables and constraints (like sudokus), build one template problem and solve clones of it with changed domains,
+        so the constraint graph is only indexed once. Adding a variable or constraint to a clone makes the clone index itself again, and leaves this problem as it is.
+
+        @rtype: a Problem with the same heuristics
+        """
+        if not self.var_list:
+            self.var_constr_dict = self.mapVarToConstraints()
+            self.indexVariables()
+        problem = Problem(minimal_remaining_values=self.mrv, forward_checking=self.fc, degree_heuristic=self.dh, least_constraining_value=self.lcv)
+        problem.variables = dict(self.variables)
+        problem.constraints = list(self.constraints)
+        problem.var_constr_dict = self.var_constr_dict
+        problem.var_neighbors = self.var_neighbors
+        problem.shared_constraints = list(self.shared_constraints)
+        problem.shared_neighbors = self.shared_neighbors
+        problem.var_list = self.var_list
+        problem.var_id = self.var_id
+        problem.neighbor_ids = self.neighbor_ids
+        return problem
+
     def getSolution(self):
         """
         Returns a solution for the CSP-problem. The type of solver is specified in the __init__, as are the heuristics for the solver.
 
-        @rtype: a dictionary with an assignment of variables.
+        @rtype: a dictionary with an assignment of variables, or None if the problem has no solution.
 
         """
-        self.var_constr_dict = self.mapVarToConstraints()
+        # a clone already has the variable ids of its template, until a variable or constraint is added to it
+        if not self.var_list:
+            self.var_constr_dict = self.mapVarToConstraints()
+            self.indexVariables()
+        self.masks = [self.variables[variable] for variable in self.var_list]
 
-        start = time.time()
+        start = _cpu_time()
         solution = self.solver.getSolution(self)
-        self.runtime = time.time() - start
+        self.runtime = _cpu_time() - start
+        # rewrite the bitmasks back to domains of the variables
+        if solution is not None:
+            solution = dict((variable, mask2domain(mask)) for variable, mask in zip(self.var_list, solution))
         # solution is an assignment of problem, where the assignments for all variables are filled in. 
         return solution, self.getStatistics()
 
@@ -109,158 +286,194 @@ class BacktrackingSolver(object):
 
     """
 
-    def __init__(self, forward_checking = False, minimal_remaining_values = False, degree_heuristic = False):
+    def __init__(self, forward_checking = False, minimal_remaining_values = False, degree_heuristic = False, least_constraining_value = False):
         self.forward_checking = forward_checking
         self.mrv = minimal_remaining_values
         self.dh = degree_heuristic
+        self.lcv = least_constraining_value
+
+        # the heuristics do not change during the search, so the function that selects the next variable is chosen once, here.
+        if self.mrv and self.dh:
+            self.select_variable = self.select_both
+        elif self.dh:
+            self.select_variable = self.select_dh
+        elif self.mrv:
+            self.select_variable = self.select_mrv
+        else:
+            self.select_variable = self.select_first
+
+        # same for the function that decides in which order the values of the selected variable are tried.
+        if self.lcv:
+            self.order_values = self.order_lcv
+        else:
+            self.order_values = self.order_ascending
 
     def getSolution(self, problem):
         """ Gets a solution for the given problem. 
 
-            @rtype: a dictionary with an assignment of variables, or False if no consistent assignment is found.
+            @rtype: a list with the assigned bitmask of every variable id, or None if no consistent assignment is found.
 
         """
+        # a variable without any value left can never be assigned, and the select functions would take it for an assigned variable
+        if 0 in problem.masks:
+            return None
+
+        # trail of (variable, removed value bit) pairs, used to undo domain reductions on backtracking
+        trail = []
         if self.forward_checking:
-            problem, assigned = self.update_domains(problem,[])
+            # propagate all initially assigned variables in one go
+            problem, assigned, consistent = self.update_domains(problem, [], trail)
+            if not consistent:
+                return None
+            # these reductions are the baseline of the search and are never undone, so the search can start with an empty trail
+            del trail[:]
 
-        return self.backtrack(problem)
+        return self.backtrack(problem, trail)
 
-    def backtrack(self, problem):
+    def backtrack(self, problem, trail):
         """ The backtracking part of the solver. backtracks depth-first through the searchspace to find a solution.
+            instead of copying all domains at every level, the values removed by update_domains are recorded on the trail, and put back when a branch fails.
+
+            the search does not recurse, but keeps an explicit stack with a frame for every level: the variable that is assigned at that level, an iterator over the (bit, value) pairs that are left to try, the domain the variable had, and the length of the trail when the level was entered.
 
         """
 
-        #OLD CODE
-        # # find unassigned variables
-        # u = (v for v in problem.variables if len(problem.variables[v]) > 1 )
-         
-        # Find unassigned variables
-        u = [var for var,d in problem.variables.iteritems() if len(problem.variables[var]) > 1 ]
+        # the masks are looked up once, instead of on every access
+        masks = problem.masks
 
-        if len(u) == 0:
-            return problem.variables
-        
-        # Decide which unassigned variable to assign a value first
-        if self.mrv and not self.dh:
-            unassigned = self.sort_mrv(u, problem.variables)
-        elif not self.mrv and self.dh:
-            unassigned = self.sort_dh(u, problem.var_constr_dict)
-        elif self.dh and self.mrv:
-            unassigned = self.sort_both(u, problem.variables, problem.var_constr_dict)
-        elif not self.mrv and not self.dh:
-            u = (v for v in problem.variables if len(problem.variables[v]) > 1 )
-            unassigned_vars = [ (len(problem.variables[v]), v) for v in u ]
-            unassigned = unassigned_vars[0][1]
-
-        # OLD CODE
-        # order unassigned variables
-        # if self.mrv:
-        #     unassigned_vars.sort()
-        # unassigned = unassigned_vars[0][1]
-
-        # make a copy of current state for backtracking
-        copy_variables = deepcopy(problem.variables)      
-
-        # Get domain of unassigned variable
-        domain = problem.variables[unassigned]
-        for value in domain:
-            # Assign value to variable
-            problem.variables[unassigned] = [value]
+        unassigned = self.select_variable(problem)
+        if unassigned is None:
+            return masks
+        stack = [(unassigned, self.order_values(problem, unassigned), masks[unassigned], len(trail))]
+
+        while stack:
+            unassigned, values, saved_domain, trail_mark = stack[-1]
+            # undo the domain updates of the value that was tried last at this level
+            self.undo(problem, trail, trail_mark)
+
+            bit_value = next(values, None)
+            if bit_value is None:
+                # all values failed: restore the domain, and backtrack to the previous level
+                masks[unassigned] = saved_domain
+                stack.pop()
+                continue
+
+            # Assign value to variable, which is just its bit
+            masks[unassigned] = bit_value[0]
             # Update domains
-            problem, assigned = self.update_domains(problem, [unassigned])
-            if self.check_assignment(problem, assigned):
+            problem, assigned, consistent = self.update_domains(problem, [unassigned], trail)
+            if consistent:
                 problem.splits += 1
-                result = self.backtrack(problem)
-                if isinstance(result, dict):
-                    return result
-            problem.variables = deepcopy(copy_variables)
+                # go one level deeper, or return the solution if all variables are assigned
+                unassigned = self.select_variable(problem)
+                if unassigned is None:
+                    return masks
+                stack.append((unassigned, self.order_values(problem, unassigned), masks[unassigned], len(trail)))
+
+        return None
 
-        problem.variables = deepcopy(copy_variables)
-        return False
+    def undo(self, problem, trail, trail_mark):
+        """ restores the domains to the state they were in when the trail had length trail_mark, by putting back the removed values in reverse order.
+            the entries are popped off the one trail list that is used for the whole search, so undoing does not allocate a slice.
 
-    def update_domains(self, problem, assigned):
+        """
+        masks = problem.masks
+        while len(trail) > trail_mark:
+            variable, bit = trail.pop()
+            masks[variable] |= bit
+
+    def update_domains(self, problem, assigned, trail):
         """ updates the domains for a problem, after assigning values.
             this reduces the domains, if forward_checking is enabled.
 
             we only update the domains locally, and do this only once.
+            every removed value is appended to the trail as a (variable, value bit) tuple, so the removal can be undone.
+
+            the assigned value is also removed from neighbors that are already assigned, so a clash between two assigned variables shows up as an empty domain. In that case the update stops and consistent is returned as False, so the constraints do not have to be checked separately.
 
         """
 
         # For first update round: find all assigned values
         if len(assigned) == 0:
-            assigned = [ v for v in problem.variables if len(problem.variables[v]) == 1 ]
-
-        # Loop over assigned variables    
-        for var1 in assigned:
-            # Find constraints for assigned var
-            myconstraints = problem.var_constr_dict[var1]
-            for constraint_obj in myconstraints:
-                # Find variables that assigned var is constrained by
-                other_vars = constraint_obj.getOthers(var1)
-                for var2 in other_vars:
-                    # If variables that assigned var is constrained by
-                    # have its assigned value in domain, remove it
-                    if len(problem.variables[var2]) != 1:
-                        assigned_value = problem.variables[var1][0]
-                        if assigned_value in problem.variables[var2]:
-                            problem.variables[var2].remove(assigned_value)
-                            if len(problem.variables[var2]) == 1:
-                                assigned.append(var2)
-        return problem, assigned
-
-
-    def check_assignment(self, problem, assigned):
-        """ after updating a domain, check if the assignment of a variable causes a clash with the rest of the solution.
+            # a mask with a single bit set has no bits left after clearing its lowest one
+            assigned = [ i for i, mask in enumerate(problem.masks) if mask and not mask & (mask - 1) ]
+
+        consistent = propagate(problem.masks, problem.neighbor_ids, assigned, trail)
+        return problem, assigned, consistent
+
+
+    # The select functions decide which unassigned variable to assign a value first, and return None if all variables are assigned.
+    # One of them is used as self.select_variable, depending on the heuristics.
+
+    def select_first(self, problem):
+        """ takes the first unassigned variable.
+        """
+        return next((i for i, mask in enumerate(problem.masks) if mask & (mask - 1)), None)
+
+    def select_dh(self, problem):
+        """ takes the unassigned variable according to the degree heuristic.
+        """
+        # Find unassigned variables
+        u = set(i for i, mask in enumerate(problem.masks) if mask & (mask - 1) )
+        if len(u) == 0:
+            return None
+        return self.sort_dh(u, problem.neighbor_ids)
+
+    def select_both(self, problem):
+        """ takes the unassigned variable according to the degree heuristic, with ties broken by minimal remaining values.
+        """
+        # Find unassigned variables
+        u = set(i for i, mask in enumerate(problem.masks) if mask & (mask - 1) )
+        if len(u) == 0:
+            return None
+        return self.sort_both(u, problem.masks, problem.neighbor_ids)
+
+    def select_mrv(self, problem):
+        """ finds the unassigned variable with the smallest domain, in a single pass over the masks, without collecting all unassigned variables first.
+        """
+        best = None
+        best_size = 0
+        for i, mask in enumerate(problem.masks):
+            if mask & (mask - 1):
+                size = _popcount(mask)
+                if best is None or size < best_size:
+                    best = i
+                    best_size = size
+                    # an unassigned variable has at least 2 values, so we cannot do better than this.
+                    if size == 2:
+                        break
+        return best
+
+    # The order functions return an iterator over the (bit, value) pairs of the domain of a variable, in the order in which they are tried.
+    # One of them is used as self.order_values, depending on the heuristics.
+
+    def order_ascending(self, problem, variable):
+        """ tries the values from low to high.
+        """
+        return _iter_bits(problem.masks[variable])
 
+    def order_lcv(self, problem, variable):
+        """ least constraining value: tries the values that are in the domains of the fewest neighbors first, as these rule out the fewest values for the neighbors.
         """
-        flag = True
-        for variable in assigned:
-            myconstraints = problem.var_constr_dict[variable]
-            for constraint_obj in myconstraints:
-                flag = constraint_obj.check(problem, variable)
-                if flag == False:
-                    return flag
-        return flag
+        masks = problem.masks
+        neighbors = problem.neighbor_ids[variable]
+        values = sorted(_iter_bits(masks[variable]), key=lambda bit_value: sum(1 for n in neighbors if masks[n] & bit_value[0]))
+        return iter(values)
 
     def sort_mrv(self, unassigned, variables):
-        domain_order = [(len(variables[v]), v) for v in unassigned]
-        domain_order.sort()
-        return domain_order[0][1]
+        # only the variable with the smallest domain is needed, so a single min() pass is enough instead of sorting
+        return min((_popcount(variables[v]), v) for v in unassigned)[1]
   
-    def sort_dh(self, unassigned, var_constr_dict):
-        count_cvars = []
-        for var in unassigned:
-            c_list = []
-            myconstraints = var_constr_dict[var]
-            for constraint in myconstraints:
-                for other_var in constraint.getOthers(var):
-                    if (other_var in unassigned) and (other_var not in c_list):
-                        c_list.append(other_var)
-            count_cvars.append((len(c_list), var))
-        count_cvars.sort()     
-        return count_cvars[0][1]
-
-    def sort_both(self, unassigned, variables, var_constr_dict):
-        count_cvars = []
-        for var in unassigned:
-            c_list = []
-            myconstraints = var_constr_dict[var]
-            for constraint in myconstraints:
-                for other_var in constraint.getOthers(var):
-                    if (other_var in unassigned) and (other_var not in c_list):
-                        c_list.append(other_var)
-            count_cvars.append((len(c_list), var))
-        count_cvars.sort()  
-        var_set = [v for (l,v) in count_cvars if l == count_cvars[0][0]]
+    def sort_dh(self, unassigned, var_neighbors):
+        # the unassigned neighbors of a variable are the intersection of its neighbor set with the unassigned set
+        return min((len(var_neighbors[var] & unassigned), var) for var in unassigned)[1]
+
+    def sort_both(self, unassigned, variables, var_neighbors):
+        count_cvars = [(len(var_neighbors[var] & unassigned), var) for var in unassigned]
+        min_count = min(count_cvars)[0]
+        var_set = [v for (l,v) in count_cvars if l == min_count]
         return self.sort_mrv(var_set, variables)
 
-#        mrv = []
-#        domain_size = 2
-#        while len(mrv) == 0:
-#            mrv = [v for v in unassigned if len(variables[v]) == domain_size]
-#            domain_size += 1
-#        return self.sort_dh(mrv, var_constr_dict)
-
  
 class AllDifferentConstraint(object):
     """ init a constraint over variables. If these variables are not given, the constraint will be over all variables.
@@ -274,16 +487,12 @@ class AllDifferentConstraint(object):
         """
         self.const_vars = constrained_variables
 
-    def getOthers(self, variable):
-        """ returns a list of all the constraint variables, except the argument variable.
-        """
-        return [item for item in self.const_vars if item != variable]
+        # the other variables of every variable are computed only once, as getOthers is called for every variable in the constraint when the neighbors are mapped.
+        self._others = {}
+        for variable in self.const_vars:
+            self._others[variable] = tuple(item for item in self.const_vars if item != variable)
 
-    def check(self, problem, updated_var):
-        """ check if constraint is still satisfied, after an update. 
+    def getOthers(self, variable):
+        """ returns a tuple of all the constraint variables, except the argument variable.
         """
-        for var in self.getOthers(updated_var):
-            if len(problem.variables[var]) == 1:
-                if problem.variables[var] == problem.variables[updated_var]:
-                    return False
-        return True
+        return self._others[variable]
@@ -13,152 +13,203 @@ from constraintproblem import *
 import sys
 from pprint import pprint
 import os
+import re
 import csv
 from random import shuffle
 from datetime import datetime
-from collections import OrderedDict
+from collections import OrderedDict, Counter, defaultdict
+from contextlib import closing
+try:
+    # python 2: the csv module writes byte strings
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+from array import array
+from multiprocessing import Pool, cpu_count
 
 CHECK_X_SUDOKUS = 0
-SUDOKUS = []
-N_SUDOKUS = 0
+
+# everything in an input line that is not a digit, and is skipped when reading sudokus
+NON_DIGITS = re.compile("[^0-9]")
+
+# bitmask with the digits 1-9. bit d stands for digit d, just like the domains in constraintproblem.
+ALL_DIGITS = domain2mask(range(1,10))
+
+# the units (rows, columns and boxes) and the peers of the cells are the same for every sudoku, so they are made only once, as are the constraints over the units.
+ROWS = [[(i, j) for j in range(1, 10)] for i in range(1, 10)]
+COLS = [[(i, j) for i in range(1, 10)] for j in range(1, 10)]
+BOXES = [[(3 * br + r + 1, 3 * bc + c + 1) for r in range(3) for c in range(3)] for br in range(3) for bc in range(3)]
+UNITS = ROWS + COLS + BOXES
+ALL_CELLS = [cell for row in ROWS for cell in row]
+# the peers of a cell are all other cells in its row, column and box
+PEERS = dict((cell, frozenset(peer for unit in UNITS if cell in unit for peer in unit if peer != cell)) for cell in ALL_CELLS)
+UNIT_CONSTRAINTS = [AllDifferentConstraint(unit) for unit in UNITS]
+# template problems of an empty sudoku, one for every combination of heuristics. see build_problem
+TEMPLATES = {}
 
 class Sudoku(object):
     """ instance of a sudoku. we use this to save some valuable statistics, and other useful information for fast access.
 
     """
 
-    def __init__(self, sudoku):
-        self.sudoku = sudoku
-        self.string_representation = array2output(sudoku)
+    def __init__(self, sudoku_string, line_number = None):
+        """ @param sudoku_string: the digits of the sudoku row by row, with 0 for an empty cell.
+            @param line_number: line of the inputfile the sudoku was read from, to find it back in messages.
+        """
+        self.string_representation = sudoku_string
+        self.line_number = line_number
         self.givens = len(self.string_representation) - self.string_representation.count("0")
-        self.freq_d = self.calculate_frequency(sudoku)
+        self.bitboard = BitBoard(self.string_representation)
+        self.freq_d = self.calculate_frequency(self.string_representation)
         self.variance = self.variance(self.freq_d)
         self.runtime = 0
         self.splits = 0
         self.solved = False
 
-    def calculate_frequency(self, grid):
+    @property
+    def sudoku(self):
+        """ the sudoku as a 2dimensional array of ints. It is only made when it is asked for, as the solver only needs the string.
+        """
+        sudoku_string = self.string_representation
+        return [list(map(int, sudoku_string[i:i + 9])) for i in range(0, len(sudoku_string) - 8, 9)]
+
+    def calculate_frequency(self, sudoku_string):
         """ calculates the freqency distribution of a distribution of numbers in a sudoku, i.e. the number of occurences, of the number of occurences.
             returns a dictionary with the frequency distribution.
         """ 
-        d = {1: 0, 2: 0, 3: 0,
-             4: 0, 5: 0, 6: 0, 
-             7: 0, 8: 0, 9: 0}
-        # first, we calculate the frequency of every number that is not 0
-        for row in grid:
-            for digit in row:
-                if d.has_key(digit):
-                    d[digit] += 1
+        # first, we calculate the frequency of every number that is not 0, in one pass over the 81 character string form of the sudoku
+        d = Counter(sudoku_string)
 
         # because we dont care about which number occurs how many times, we calculate the frequency of the frequency. We take this distribution to be the distinguisable attribute of a sudoku, where the total number of given numbers is the same between the sudoku's we compare.
-        freq_d = {}
-        for key,value in d.iteritems():
-            if value in freq_d.keys():
-                freq_d[value] += 1
-            else: 
-                freq_d[value] = 1
-        return freq_d
+        # numbers that do not occur count as a frequency of 0.
+        freq_d = Counter(d[str(digit)] for digit in range(1,10))
+        return dict(freq_d)
 
     def variance(self, distribution):
         """
             calculates the variance of a dictionary, containing the distribution
         """ 
+        # one pass over the distribution, summing the frequencies, and the (squared) keys weighted by them.
+        # these are all integers, so variance = (n * sum(k^2) - sum(k)^2) / n^2 is exact up to the final division.
         freq_sum = 0
+        square_sum = 0
         n = 0
-        d = 0
-        for key,value in distribution.iteritems():
+        for key,value in distribution.items():
             freq_sum += key * value
+            square_sum += key * key * value
             n += value
-        mean = float(freq_sum) / n
-        for key,value in distribution.iteritems():
-            d += value * (key - mean)**2
-        variance = float(d) / n
+        variance = float(n * square_sum - freq_sum * freq_sum) / (n * n)
         return variance
 
 
+class BitBoard(object):
+    """ bitmask representation of a sudoku. row, col and box hold a mask of the digits that are given in every row, column and box.
+        cand holds a mask of the candidate digits of every cell, in row-major order: the given digit, or the digits that are not given in the row, column and box of the cell.
+        it is built from the string of 81 digits of the sudoku, with 0 for an empty cell.
+
+    """
+
+    def __init__(self, sudoku_string):
+        digits = [int(character) for character in sudoku_string]
+        self.row = [0] * 9
+        self.col = [0] * 9
+        self.box = [0] * 9
+        for r in range(9):
+            for c in range(9):
+                if digits[r * 9 + c] != 0:
+                    bit = 1 << digits[r * 9 + c]
+                    self.row[r] |= bit
+                    self.col[c] |= bit
+                    self.box[(r // 3) * 3 + c // 3] |= bit
+
+        self.cand = array('H', [0] * 81)
+        for r in range(9):
+            for c in range(9):
+                if digits[r * 9 + c] != 0:
+                    self.cand[r * 9 + c] = 1 << digits[r * 9 + c]
+                else:
+                    self.cand[r * 9 + c] = ALL_DIGITS & ~(self.row[r] | self.col[c] | self.box[(r // 3) * 3 + c // 3])
+
+    def is_given(self, r, c):
+        """ the candidates of an empty cell never contain a digit given in its row, so the cell is given if its candidate is.
+        """
+        return self.cand[r * 9 + c] & self.row[r] != 0
+
+
 def read_sudokus(filename):
-    """import all sudoku's from file given by user"""
+    """import all sudoku's from file given by user, and return them as a list of Sudoku objects"""
+    sudokus = []
 
     try:
         with open(filename,'r') as f:
             # For each sudoku in the file
-            for line in f:
-                line = line.replace(".","0")
-                sudoku = []
-                row = []
-                for character in line:
-                    if character.isdigit():
-                        row.append(int(character))
-                    # Go to next row when all columns are read    
-                    if (len(row) == 9):
-                        sudoku.append(row)
-                        row = []
-                sud = Sudoku(sudoku)
-                SUDOKUS.append(sud)
+            for line_number, line in enumerate(f, 1):
+                # empty cells are a '.' or a '0'. All other characters that are not a digit are removed in one go.
+                sudoku_string = NON_DIGITS.sub("", line.replace(".","0"))
+                if not sudoku_string:
+                    continue
+                # a sudoku is the first 81 digits of the line, lines with fewer digits are skipped.
+                if len(sudoku_string) < 81:
+                    print("line {0}: expected 81 digits, found {1}, skipping it".format(line_number, len(sudoku_string)))
+                    continue
+                sud = Sudoku(sudoku_string[:81], line_number)
+                sudokus.append(sud)
             f.close()
     except IOError as e:
-        print "I/O error({0}): {1}".format(e.errno, e.strerror)
+        print("I/O error({0}): {1}".format(e.errno, e.strerror))
+    return sudokus
 
-def variable_domains(problem,sudoku):
+def variable_domains(problem, bitboard):
     """ Add variables with domain 1-9 for each variable
     we also have to somehow translate all the sudokuchars to constraints. i.e. if (1,1) = 1 at init, there needs to be a constraint over variable (1,1) so that its domain is only [1]. 
+    with forward checking, the empty cells get their candidates from the bitboard as domain, as the first forward checking round would remove the given digits anyway.
+    the bitmasks of the bitboard are the domains of the problem as they are, so they are not rewritten to lists.
     """
     for row in range(9):
         for col in range(9):
-            if sudoku[row][col] == 0:
-                problem.addVariable((row + 1, col + 1), range(1,10))
+            if problem.fc or bitboard.is_given(row, col):
+                problem.addVariableMask((row + 1, col + 1), bitboard.cand[row * 9 + col])
             else:
-                problem.addVariable((row + 1, col + 1), [sudoku[row][col]])
+                problem.addVariableMask((row + 1, col + 1), ALL_DIGITS)
     return problem
 
 def sudoku_constraints(problem):
-    """ Add constraints standard for all sudokus """
-
-    # Add row constraints
-    for i in range(1,10):        
-        problem.addConstraint([(i,1), (i,2), (i,3), (i,4), (i,5), (i,6), (i,7), (i,8), (i,9)])
-    # Add column constraints   
-    for j in range(1,10):
-        problem.addConstraint([(1,j), (2,j), (3,j), (4,j), (5,j), (6,j), (7,j), (8,j), (9,j)])
-
-    # Add box constraints 
-    problem.addConstraint([(1,1),(1,2),(1,3),(2,1),(2,2),(2,3),(3,1),(3,2),(3,3)])
-    problem.addConstraint([(1,4),(1,5),(1,6),(2,4),(2,5),(2,6),(3,4),(3,5),(3,6)])
-    problem.addConstraint([(1,7),(1,8),(1,9),(2,7),(2,8),(2,9),(3,7),(3,8),(3,9)])
-
-    problem.addConstraint([(4,1),(4,2),(4,3),(5,1),(5,2),(5,3),(6,1),(6,2),(6,3)])
-    problem.addConstraint([(4,4),(4,5),(4,6),(5,4),(5,5),(5,6),(6,4),(6,5),(6,6)])
-    problem.addConstraint([(4,7),(4,8),(4,9),(5,7),(5,8),(5,9),(6,7),(6,8),(6,9)])
-
-    problem.addConstraint([(7,1),(7,2),(7,3),(8,1),(8,2),(8,3),(9,1),(9,2),(9,3)])
-    problem.addConstraint([(7,4),(7,5),(7,6),(8,4),(8,5),(8,6),(9,4),(9,5),(9,6)])
-    problem.addConstraint([(7,7),(7,8),(7,9),(8,7),(8,8),(8,9),(9,7),(9,8),(9,9)])
+    """ Add constraints standard for all sudokus: one for every row, column and box. These are shared between all sudokus. """
+    problem.addSharedConstraints(UNIT_CONSTRAINTS, PEERS)
     return problem
 
+def build_problem(bitboard, heuristics):
+    """ builds the problem for a sudoku as a clone of a template problem, so the variables and constraints of the empty sudoku are only added and indexed once per process.
+
+        @param bitboard: BitBoard of the sudoku
+        @param heuristics: tuple of (forward_checking, minimal_remaining_values, degree_heuristic, least_constraining_value)
+        @rtype: Problem with the domains of the sudoku
+    """
+    if heuristics not in TEMPLATES:
+        forward_checking, minimal_remaining_values, degree_heuristic, least_constraining_value = heuristics
+        template = Problem(forward_checking=forward_checking, minimal_remaining_values=minimal_remaining_values, degree_heuristic = degree_heuristic, least_constraining_value = least_constraining_value)
+        template.addVariables(ALL_CELLS, range(1,10))
+        TEMPLATES[heuristics] = sudoku_constraints(template)
+    problem = TEMPLATES[heuristics].clone()
+    return variable_domains(problem, bitboard)
+
 def solution2array(solution):
     """ rewrites an solution of the form  {(1,1): [4], (1,2): [5] , .... (9,9) : [1]} to an 2dimensional array.
         this is useful if we want to output it in a human readable form.
         this is also used as intermediate step for rewriting the sudoku back to the original format.
     """
-    sudoku_array = []
-    for i in range(9):
-        sudoku_array.append([])
-        for j in range(9):
-            sudoku_array[i].append(0)
-    for variable, assignment in solution.iteritems():
+    # allocate every row in one go, instead of appending the cells one by one
+    sudoku_array = [[0] * 9 for i in range(9)]
+    for (row, col), assignment in solution.items():
         if len(assignment) == 1:
-            sudoku_array[variable[0] -1][variable[1] - 1] = assignment[0]
+            sudoku_array[row - 1][col - 1] = assignment[0]
     return sudoku_array
 
 def array2output(solution_array):
     """ rewrite a 2dimensional array to long string, just like the input.
 
     """
-    outputstring = ""
-    for i in range(9):
-        for j in range(9):
-            outputstring += str(solution_array[i][j])
-    return outputstring
+    return "".join(str(digit) for row in solution_array for digit in row)
 
 def output_data(outputfile, output):
     """ outputs the solutions to the specified outputfile
@@ -168,14 +219,25 @@ def output_data(outputfile, output):
                 f.write(sudoku)
                 f.write("\n")
 
-def print_statistics(forward_checking = False, minimal_remaining_values = False, degree_heuristic = False):
-    """ method that prints statistics to a file.
+def group_averages(sudoku_objs, n_suds):
+    """ calculates the average runtime and average splits of a group of sudokus, over the solved sudokus in the group. sudokus without a solution are left out.
 
+        @param sudoku_objs: list of Sudoku objects in the group
+        @param n_suds: number of solved sudokus in the group
+        @rtype: tuple of the average runtime and the average splits, (0, 0) if no sudoku in the group is solved
     """
-    os.chdir("statistics/")
+    if n_suds == 0:
+        return 0, 0
+    solved = [sudoku_obj for sudoku_obj in sudoku_objs if sudoku_obj.solved]
+    return sum(sudoku_obj.runtime for sudoku_obj in solved)/n_suds, sum(sudoku_obj.splits for sudoku_obj in solved)/n_suds
 
+def print_statistics(sudokus, forward_checking = False, minimal_remaining_values = False, degree_heuristic = False, least_constraining_value = False):
+    """ method that prints statistics of the solved sudokus to a file in the statistics directory.
+
+    """
+    n_sudokus = len(sudokus)
     dt = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
-    filename = str(CHECK_X_SUDOKUS) + "-"
+    filename = str(n_sudokus) + "-"
 
     if forward_checking:
         filename += "fc-"
@@ -183,108 +245,110 @@ def print_statistics(forward_checking = False, minimal_remaining_values = False,
         filename += "mrv-"
     if degree_heuristic:
         filename += "dh-"
-    filename += str(dt) + ".csv"
+    if least_constraining_value:
+        filename += "lcv-"
+    filename += dt + ".csv"
+
+    # write to statistics/ by path, instead of changing the working directory of the process
+    if not os.path.isdir("statistics"):
+        os.makedirs("statistics")
+    path = os.path.join("statistics", filename)
 
-    with open(filename, 'wb') as csvfile:
+    # the rows are written to a buffer, and the file is written in one go at the end
+    with closing(StringIO()) as csvbuffer:
 
-        spamwriter = csv.writer(csvfile, delimiter=',',
+        spamwriter = csv.writer(csvbuffer, delimiter=',',
                                 quotechar='|', quoting=csv.QUOTE_MINIMAL)
+        # totals and the grouping on givens are gathered in a single pass over the sudokus
+        # the total runtime includes the sudokus without a solution, the average splits only count the solved ones
         runtime = 0
         avg_splits = 0
-        for sudoku_obj in SUDOKUS:
-            runtime += sudoku_obj.runtime        
-            avg_splits += sudoku_obj.splits 
-        avg_splits = avg_splits/N_SUDOKUS
-        spamwriter.writerow(['Heuristics:', 'forward_checking = ' + str(forward_checking), 'minimal_remaining_values = ' + str(minimal_remaining_values)])
+        n_solved = 0
+        givens_dict = defaultdict(list)
+        givens_solved_dict = Counter()
+        for sudoku_obj in sudokus:
+            runtime += sudoku_obj.runtime
+            givens_dict[sudoku_obj.givens].append(sudoku_obj)
+            if sudoku_obj.solved:
+                avg_splits += sudoku_obj.splits
+                n_solved += 1
+                givens_solved_dict[sudoku_obj.givens] += 1
+        if n_solved > 0:
+            avg_splits = avg_splits/n_solved
+        spamwriter.writerow(['Heuristics:', 'forward_checking = ' + str(forward_checking), 'minimal_remaining_values = ' + str(minimal_remaining_values), 'degree_heuristic = ' + str(degree_heuristic), 'least_constraining_value = ' + str(least_constraining_value)])
 
         spamwriter.writerow(['--------------------------'])
-        spamwriter.writerow(['Number of sudokus', N_SUDOKUS])
+        spamwriter.writerow(['Number of sudokus', n_sudokus])
         spamwriter.writerow(['total runtime', round(runtime,3)])
         spamwriter.writerow(['average splits:', avg_splits])
         spamwriter.writerow(['--------------------------'])
 
         # NOW CALCULATE statistics for givens
-        givens_dict = {}
-        givens_solved_dict = {}
-        for sudoku_obj in SUDOKUS:
-            if sudoku_obj.givens in givens_dict.keys():
-                givens_dict[sudoku_obj.givens].append(sudoku_obj)
-            else:
-                givens_dict[sudoku_obj.givens] = [sudoku_obj]
-
-        givens_solved_dict = dict.fromkeys(givens_dict.keys(),0)
-        for sudoku_obj in SUDOKUS:
-            if sudoku_obj.solved:
-                    givens_solved_dict[sudoku_obj.givens] += 1
-
         spamwriter.writerow(['givens', 'number of occurences', 'average runtime', 'average splits'])
-        for givens, sudoku_objs in givens_dict.iteritems():
-            avg_runtime = 0
-            avg_splits = 0
-            for sudoku_obj in sudoku_objs:
-                avg_runtime += sudoku_obj.runtime
-                avg_splits += sudoku_obj.splits
+        for givens, sudoku_objs in givens_dict.items():
             n_suds = givens_solved_dict[givens]
-            if n_suds > 0:
-                avg_runtime = avg_runtime/n_suds
-                avg_splits = avg_splits/n_suds
-            else:
-                avg_runtime = 0
-                avg_splits = 0
-            spamwriter.writerow([givens, givens_solved_dict[givens], avg_runtime, avg_splits])
+            avg_runtime, avg_splits = group_averages(sudoku_objs, n_suds)
+            spamwriter.writerow([givens, n_suds, avg_runtime, avg_splits])
         spamwriter.writerow(['--------------------------'])
 
-        for n_givens, objects in givens_dict.iteritems():
+        for n_givens, objects in givens_dict.items():
             # Now we calculate statistics for variances per n_givens
-            variance_dict = {}
-            variance_solved_dict = {}
-            for sudoku_obj in givens_dict[n_givens]:
-                if sudoku_obj.variance in variance_dict.keys():
-                    variance_dict[sudoku_obj.variance].append(sudoku_obj)
-                else:
-                    variance_dict[sudoku_obj.variance] = [sudoku_obj]
-
-            variance_solved_dict = dict.fromkeys(variance_dict.keys(),0)
-            for sudoku_obj in givens_dict[n_givens]:
+            variance_dict = defaultdict(list)
+            variance_solved_dict = Counter()
+            for sudoku_obj in objects:
+                variance_dict[sudoku_obj.variance].append(sudoku_obj)
                 if sudoku_obj.solved:
-                        variance_solved_dict[sudoku_obj.variance] += 1
+                    variance_solved_dict[sudoku_obj.variance] += 1
             spamwriter.writerow(['variance distribution for givens = ' + str(n_givens)])
             spamwriter.writerow(['variances','number of occurences', 'average runtime', 'average splits'])
 
             od = OrderedDict(sorted(variance_dict.items()))
-            for variance, sudoku_objs in od.iteritems():
-                avg_runtime = 0
-                avg_splits = 0
-                for sudoku_obj in sudoku_objs:
-                    avg_runtime += sudoku_obj.runtime 
-                    avg_splits += sudoku_obj.splits
+            for variance, sudoku_objs in od.items():
                 n_suds = variance_solved_dict[variance]
-                if n_suds > 0:
-                    avg_runtime = avg_runtime/n_suds
-                    avg_splits = avg_splits/n_suds
-                else:
-                    avg_runtime = 0
-                    avg_splits = 0
-                spamwriter.writerow([variance, variance_solved_dict[variance], avg_runtime, avg_splits])
+                avg_runtime, avg_splits = group_averages(sudoku_objs, n_suds)
+                spamwriter.writerow([variance, n_suds, avg_runtime, avg_splits])
             spamwriter.writerow(['--------------------------'])
-    os.chdir("../")
 
-def main(arg, forward_checking = False, minimal_remaining_values=False, degree_heuristic = False):
+        # the csv module wants a binary file in python 2, and a text file without newline translation in python 3
+        if sys.version_info[0] < 3:
+            csvfile = open(path, 'wb')
+        else:
+            csvfile = open(path, 'w', newline='')
+        with csvfile:
+            csvfile.write(csvbuffer.getvalue())
+
+def solve_sudoku(job):
+    """ solves a single sudoku. The sudokus are solved in parallel by worker processes, so this function only works on its arguments.
+
+        @param job: tuple of the index of the sudoku, its bitboard, and the heuristics (forward_checking, minimal_remaining_values, degree_heuristic, least_constraining_value)
+        @rtype: tuple of the index, the solution as a 2dimensional array (None if the sudoku has no solution), and the statistics of the solver
+    """
+    index, bitboard, heuristics = job
+
+    # Here, we are initializing the sudoku.
+    problem = build_problem(bitboard, heuristics)
+
+    # Get solution (this is of the form {(1,1): [4], (1,2): [5] , .... (9,9) : [1]})
+    solution, statistics = problem.getSolution()
+    if solution is None:
+        return index, None, statistics
+    return index, solution2array(solution), statistics
+
+def main(arg, forward_checking = False, minimal_remaining_values=False, degree_heuristic = False, least_constraining_value = False, jobs = None):
     """ main function of our CSP sudoku solver. reads in an inputfile with sudokus and outputs the result to a .txt file specified, or to the command line if the outputfile is not specified explicitly as an argument.
 
         @param forward_checking: search heuristic, default is False
         @param minimal_remaining_values: search heuristic, default is False
+        @param degree_heuristic: search heuristic, default is False
+        @param least_constraining_value: value ordering heuristic, default is False
+        @param jobs: number of processes that solve sudokus in parallel. default is None, which uses one per cpu. With 1, all sudokus are solved in this process, which is easier for debugging.
+            the runtimes are cpu times of the solving process, so they can be compared between runs with a different number of jobs.
 
 
     A good thing to notice is that we can call this function multiple times (for example if you want to execute multiple heuristic settings). It has some overhead, but it works perfectly. A seperate statistics-file is generated for every run, so you can track the performance when tweaking values.
 
     """
 
-
-    #if only a portion of the inputfile is parsed, N_SUDOKUS calculates how much that is (this is for averaging in statistics)
-    global N_SUDOKUS
-    global CHECK_X_SUDOKUS
-    N_SUDOKUS = 0
     # We only print to file if specified in the commandline.
     print_to_file = False 
     outputfile = ""
@@ -295,42 +359,60 @@ def main(arg, forward_checking = False, minimal_remaining_values=False, degree_h
         outputfile = arg[2]
 
     # Read sudokus from text file
-    read_sudokus(arg[1])
+    sudokus = read_sudokus(arg[1])
 
     # output is OR outputted to the screen, or to the outputfile. This is a buffer where we save all solutions as a string of 81 characters for 1 sudoku.
     output = []
-    output_stats = []
-
-    # set CHECK_X_SUDOKUS to all if its init value = 0
-    if CHECK_X_SUDOKUS == 0:
-        CHECK_X_SUDOKUS = len(SUDOKUS)
-    for sudoku_obj in SUDOKUS[:CHECK_X_SUDOKUS]:
-        N_SUDOKUS += 1
-        print "solving sudoku " + str(N_SUDOKUS)
-
-        # Here, we are initializing the sudoku.
-        sudoku = sudoku_obj.sudoku
-        problem = Problem(forward_checking=forward_checking, minimal_remaining_values=minimal_remaining_values, degree_heuristic = degree_heuristic)
-        problem = variable_domains(problem, sudoku)
-        problem = sudoku_constraints(problem)
-        problem.mapVarToConstraints()
-
-        # Get solution (this is of the form {(1,1): [4], (1,2): [5] , .... (9,9) : [1]})
-        solution, statistics = problem.getSolution()
-        sudoku_obj.solved = True
-
-        # get live feedback on runtimes.
-        print statistics
-        sudoku_obj.runtime = getattr(statistics, 'runtime')
-        sudoku_obj.splits = getattr(statistics, 'splits')
-
-        # rewrite the sudoku ...
-        solution_array = solution2array(solution)
+
+    # check all sudokus if CHECK_X_SUDOKUS = 0. if only a portion of the inputfile is checked, the statistics are only over that portion.
+    if CHECK_X_SUDOKUS != 0:
+        sudokus = sudokus[:CHECK_X_SUDOKUS]
+
+    # the sudokus are independent, so they are solved in parallel. Only the bitboard and the heuristics are sent to the workers, the results are stored in the Sudoku objects here.
+    heuristics = (forward_checking, minimal_remaining_values, degree_heuristic, least_constraining_value)
+    work = [(index, sudoku_obj.bitboard, heuristics) for index, sudoku_obj in enumerate(sudokus)]
+    if jobs is None:
+        jobs = cpu_count()
+    pool = None
+    solution_arrays = [None] * len(sudokus)
+    try:
+        if jobs == 1:
+            results = map(solve_sudoku, work)
+        else:
+            pool = Pool(jobs)
+            # the runtime per sudoku varies a lot, so the work is handed out in small chunks
+            results = pool.imap_unordered(solve_sudoku, work, max(1, len(work) // (4 * jobs)))
+
+        for index, solution_array, statistics in results:
+            sudoku_obj = sudokus[index]
+            sudoku_obj.solved = solution_array is not None
+            # skipped lines are not counted in the index, so the sudoku is reported by its line in the inputfile
+            if sudoku_obj.solved:
+                print("solved sudoku on line " + str(sudoku_obj.line_number))
+            else:
+                print("sudoku on line " + str(sudoku_obj.line_number) + " has no solution")
+
+            # get live feedback on runtimes.
+            print(statistics)
+            sudoku_obj.runtime = getattr(statistics, 'runtime')
+            sudoku_obj.splits = getattr(statistics, 'splits')
+            solution_arrays[index] = solution_array
+    finally:
+        # all results are read when we get here without an error, so the workers can be stopped either way.
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    for sudoku_obj, solution_array in zip(sudokus, solution_arrays):
         if not print_to_file:
-            # ... so we can output it on the screen....
-            pprint(solution_array)
+            # output the sudoku on the screen, sudokus without a solution are left out....
+            if solution_array is not None:
+                pprint(solution_array)
+        elif solution_array is None:
+            #... or write the unsolved sudoku to the file, so line N of the output still belongs to sudoku N....
+            output.append(sudoku_obj.string_representation)
         else:
-            #... or to a file.
+            #... or rewrite it for a file.
             output.append(array2output(solution_array))
 
     #if an outputfile is specified
@@ -338,15 +420,29 @@ def main(arg, forward_checking = False, minimal_remaining_values=False, degree_h
         # log all the sudokus to a txt-file
         output_data(outputfile, output)
     # print statistics to a csv file.
-    print_statistics(forward_checking=forward_checking, minimal_remaining_values=minimal_remaining_values, degree_heuristic = degree_heuristic)
+    print_statistics(sudokus, forward_checking=forward_checking, minimal_remaining_values=minimal_remaining_values, degree_heuristic = degree_heuristic, least_constraining_value = least_constraining_value)
 
 if __name__ == '__main__':
     # how many sudokus do we want to check?
     # default = 0, then we check all.
     CHECK_X_SUDOKUS = 0
+    # the number of parallel processes can be given with --jobs, default is one per cpu.
+    jobs = None
+    if "--jobs" in sys.argv:
+        i = sys.argv.index("--jobs")
+        try:
+            jobs = int(sys.argv[i + 1])
+        except (IndexError, ValueError):
+            jobs = 0
+        if jobs < 1:
+            print("--jobs needs a number of processes of at least 1")
+            print("Example: python sudoku.py \"input.txt\" \"output.txt\" --jobs 4")
+            sys.exit(2)
+        del sys.argv[i:i + 2]
     if len(sys.argv) == 1:
-        print "Please give a input filename, output filename"
-        print "if no outputfile is given, the solutions will be outputted on the screen"
-        print "Example: python sudoku.py \"input.txt\" \"output.txt\" "
+        print("Please give a input filename, output filename")
+        print("if no outputfile is given, the solutions will be outputted on the screen")
+        print("the number of parallel processes can be set with --jobs, use --jobs 1 for debugging")
+        print("Example: python sudoku.py \"input.txt\" \"output.txt\" ")
     else:
-        main(sys.argv,forward_checking=True, minimal_remaining_values=True, degree_heuristic = True)
+        main(sys.argv,forward_checking=True, minimal_remaining_values=True, jobs = jobs)